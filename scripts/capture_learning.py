@@ -14,8 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from lib.reflect_utils import (
     get_queue_path,
-    load_queue,
-    save_queue,
+    append_to_queue,
     detect_patterns,
     create_queue_item,
     should_include_message,
@@ -40,15 +39,16 @@ def main() -> int:
     if not prompt:
         return 0
 
-    # Filter out system content (XML tags, tool results, session continuations)
-    if not should_include_message(prompt):
-        return 0
-
     # Skip very long prompts — real user corrections are short.
     # Exception: explicit "remember:" markers are always processed.
+    # Checked first so pasted logs and files skip the system-content scan.
     if len(prompt) > MAX_CAPTURE_PROMPT_LENGTH and "remember:" not in prompt.lower():
         return 0
 
+    # Filter out system content (XML tags, tool results, session continuations)
+    if not should_include_message(prompt):
+        return 0
+
     # Initialize queue if doesn't exist
     queue_path = get_queue_path()
     if not queue_path.exists():
@@ -69,9 +69,7 @@ def main() -> int:
             decay_days=decay_days,
         )
 
-        items = load_queue()
-        items.append(queue_item)
-        save_queue(items)
+        append_to_queue(queue_item)
 
         # Output feedback for Claude to acknowledge the capture
         # UserPromptSubmit hooks with exit code 0 add stdout as context
@@ -26,7 +26,7 @@ from typing import Dict, List, Any, Optional, Tuple
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from lib.reflect_utils import detect_patterns, extract_user_messages
+from lib.reflect_utils import detect_patterns, extract_user_messages_many
 from lib.semantic_detector import semantic_analyze
 
 # Colors for terminal output
@@ -319,8 +319,7 @@ def main():
 
     # Extract messages
     all_messages = []
-    for sf in session_files:
-        messages = extract_user_messages(sf, corrections_only=False)
+    for messages in extract_user_messages_many(session_files, corrections_only=False):
         all_messages.extend(messages)
 
     print(f"Extracted {len(all_messages)} user messages")
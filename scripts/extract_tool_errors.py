@@ -24,7 +24,7 @@ from pathlib import Path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from lib.reflect_utils import (
-    extract_tool_errors,
+    extract_tool_errors_many,
     aggregate_tool_errors,
     get_claude_dir,
 )
@@ -119,16 +119,18 @@ def main() -> int:
         return 1
 
     # Extract errors from all session files
-    all_errors = []
+    existing_files = []
     for session_file in session_files:
         if not session_file.exists():
             print(f"Warning: Session file not found: {session_file}", file=sys.stderr)
             continue
+        existing_files.append(session_file)
 
-        errors = extract_tool_errors(
-            session_file,
-            project_specific_only=not args.include_all
-        )
+    all_errors = []
+    for errors in extract_tool_errors_many(
+        existing_files,
+        project_specific_only=not args.include_all
+    ):
         all_errors.extend(errors)
 
     if not all_errors:
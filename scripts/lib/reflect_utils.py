@@ -4,11 +4,20 @@
 Cross-platform compatible (Windows, macOS, Linux).
 """
 import json
+import mmap
 import re
 import os
+import time
+from contextlib import contextmanager
+from functools import lru_cache, partial
 from pathlib import Path
-from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, IO, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # =============================================================================
 # Path utilities
@@ -42,12 +51,21 @@ def get_cleanup_period_days() -> Optional[int]:
 
 
 # Directories to exclude when searching for CLAUDE.md files
-EXCLUDED_DIRS = {
+EXCLUDED_DIRS = frozenset({
     'node_modules', '.git', '.svn', '.hg', 'venv', '.venv', 'env', '.env',
     '__pycache__', '.pytest_cache', '.mypy_cache', 'dist', 'build',
     '.next', '.nuxt', 'coverage', '.coverage', 'htmlcov',
     'vendor', 'target', 'out', 'bin', 'obj',
-}
+})
+
+
+# Rule frontmatter sits at the top of the file; read this much before parsing
+FRONTMATTER_READ_SIZE = 8192
+
+# Opening '---' line, then the shortest run of lines up to a closing '---' line
+_FRONTMATTER_RE = re.compile(
+    r"\A[^\S\n]*---[^\S\n]*\n(|.*?\n)[^\S\n]*---[^\S\n]*(?:\n|\Z)", re.DOTALL
+)
 
 
 def _parse_rule_frontmatter(filepath: Path) -> Optional[Dict[str, Any]]:
@@ -61,29 +79,24 @@ def _parse_rule_frontmatter(filepath: Path) -> Optional[Dict[str, Any]]:
         if no frontmatter is found.
     """
     try:
-        text = filepath.read_text(encoding="utf-8")
+        with filepath.open("r", encoding="utf-8") as f:
+            head = f.read(FRONTMATTER_READ_SIZE)
+            match = _FRONTMATTER_RE.match(head)
+            if len(head) == FRONTMATTER_READ_SIZE and (
+                    match is None or match.end() == len(head)):
+                # Closing '---' may be cut off or past the head; use the whole file
+                match = _FRONTMATTER_RE.match(head + f.read())
     except (IOError, OSError):
         return None
 
-    lines = text.splitlines()
-    if not lines or lines[0].strip() != "---":
-        return None
-
-    # Find closing ---
-    end_idx = None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            end_idx = i
-            break
-
-    if end_idx is None:
+    if match is None:
         return None
 
     result: Dict[str, Any] = {}
     current_key = None
     current_list: List[str] = []
 
-    for line in lines[1:end_idx]:
+    for line in match.group(1).splitlines():
         stripped = line.strip()
         if not stripped or stripped.startswith("#"):
             continue
@@ -111,6 +124,39 @@ def _parse_rule_frontmatter(filepath: Path) -> Optional[Dict[str, Any]]:
     return result if result else None
 
 
+def _find_subdir_claude_md(root: Path) -> List[Path]:
+    """Find CLAUDE.md files below root (not root itself), skipping EXCLUDED_DIRS.
+
+    Walks with os.scandir so file/directory checks come from the directory
+    listing instead of a stat per entry. Visits directories in the same
+    top-down order as os.walk and, like it, does not follow symlinked dirs.
+    """
+    found: List[Path] = []
+    root_path = str(root)
+    stack = [root_path]
+
+    while stack:
+        current = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if entry.name not in EXCLUDED_DIRS and not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    elif entry.name == "CLAUDE.md" and current != root_path:
+                        found.append(Path(entry.path))
+        except OSError:
+            continue
+        stack.extend(reversed(subdirs))
+
+    return found
+
+
 def find_claude_files(root_dir: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Find all memory tier files in the project tree.
@@ -154,23 +200,14 @@ def find_claude_files(root_dir: Optional[str] = None) -> List[Dict[str, Any]]:
         })
 
     # Search for CLAUDE.md in subdirectories
-    for dirpath, dirnames, filenames in os.walk(root):
-        # Skip excluded directories
-        dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
-
-        # Skip root (already handled)
-        if Path(dirpath) == root:
-            continue
-
-        if "CLAUDE.md" in filenames:
-            full_path = Path(dirpath) / "CLAUDE.md"
-            rel_path = full_path.relative_to(root)
-            # Use as_posix() for consistent forward slashes on all platforms
-            results.append({
-                "path": str(full_path),
-                "relative_path": f"./{rel_path.as_posix()}",
-                "type": "subdirectory",
-            })
+    for full_path in _find_subdir_claude_md(root):
+        rel_path = full_path.relative_to(root)
+        # Use as_posix() for consistent forward slashes on all platforms
+        results.append({
+            "path": str(full_path),
+            "relative_path": f"./{rel_path.as_posix()}",
+            "type": "subdirectory",
+        })
 
     # Discover project rule files: .claude/rules/*.md
     project_rules_dir = root / ".claude" / "rules"
@@ -200,6 +237,11 @@ def find_claude_files(root_dir: Optional[str] = None) -> List[Dict[str, Any]]:
     return results
 
 
+# Substrings that route a learning in suggest_claude_file()
+_MODEL_INDICATORS = ('gpt-', 'claude-', 'gemini-', 'o3', 'o4')
+_GLOBAL_BEHAVIORAL_INDICATORS = ('always ', 'never ', 'prefer ')
+
+
 def suggest_claude_file(
     learning: str,
     claude_files: List[Dict[str, Any]],
@@ -228,16 +270,14 @@ def suggest_claude_file(
         return "./.claude/rules/guardrails.md"
 
     # Model indicators → existing model-preferences rule or global CLAUDE.md
-    model_indicators = ['gpt-', 'claude-', 'gemini-', 'o3', 'o4']
-    if any(ind in learning_lower for ind in model_indicators):
+    if any(ind in learning_lower for ind in _MODEL_INDICATORS):
         for cf in claude_files:
             if cf["type"] in ("rule", "user-rule") and "model" in Path(cf["path"]).stem.lower():
                 return cf["relative_path"]
         return "~/.claude/CLAUDE.md"
 
     # Global behavioral (always/never/prefer) → global CLAUDE.md
-    global_behavioral = ['always ', 'never ', 'prefer ']
-    if any(ind in learning_lower for ind in global_behavioral):
+    if any(ind in learning_lower for ind in _GLOBAL_BEHAVIORAL_INDICATORS):
         return "~/.claude/CLAUDE.md"
 
     # Path-scoped rule match: learning mentions a directory covered by a rule's paths
@@ -270,7 +310,14 @@ def get_project_folder_name(project_dir: Optional[str] = None) -> str:
 
     /Users/bob/myapp → -Users-bob-myapp
     """
-    project_path = Path(project_dir).resolve() if project_dir else Path.cwd().resolve()
+    # Keyed on cwd as well: it decides what None and relative paths resolve to
+    return _project_folder_name(project_dir, os.getcwd())
+
+
+@lru_cache(maxsize=64)
+def _project_folder_name(project_dir: Optional[str], cwd: str) -> str:
+    """Uncached body of get_project_folder_name(); resolve() walks symlinks."""
+    project_path = Path(project_dir).resolve() if project_dir else Path(cwd).resolve()
     folder_name = str(project_path).replace("/", "-").replace("\\", "-")
     if folder_name.startswith("-"):
         folder_name = folder_name[1:]
@@ -294,10 +341,17 @@ def read_auto_memory(project_dir: Optional[str] = None) -> List[Dict[str, Any]]:
     memory_path = get_auto_memory_path(project_dir)
     results = []
 
-    if not memory_path.is_dir():
+    try:
+        with os.scandir(memory_path) as it:
+            names = sorted(
+                entry.name for entry in it
+                if entry.name.endswith(".md") and entry.is_file()
+            )
+    except OSError:
         return results
 
-    for md_file in sorted(memory_path.glob("*.md")):
+    for name in names:
+        md_file = memory_path / name
         try:
             text = md_file.read_text(encoding="utf-8")
             entries = [line.strip() for line in text.splitlines() if line.strip()]
@@ -343,23 +397,24 @@ def suggest_auto_memory_topic(learning: str) -> str:
 
 def read_all_memory_entries(
     root_dir: Optional[str] = None,
+    claude_files: Optional[List[Dict[str, Any]]] = None,
 ) -> List[Dict[str, Any]]:
     """Read bullet-point entries from ALL memory tiers for cross-tier deduplication.
 
     Scans: CLAUDE.md files, rule files, CLAUDE.local.md, and auto memory.
+    Pass claude_files from an earlier find_claude_files(root_dir) call to
+    skip walking the project tree again.
 
     Returns list of {text, source_file, source_type, line_number}.
     """
-    claude_files = find_claude_files(root_dir)
+    if claude_files is None:
+        claude_files = find_claude_files(root_dir)
     entries: List[Dict[str, Any]] = []
 
     # Read entries from each CLAUDE.md / rule / local file
     for cf in claude_files:
-        filepath = Path(cf["path"])
-        if cf["type"] == "global":
-            filepath = Path(cf["path"])
         try:
-            text = filepath.read_text(encoding="utf-8")
+            text = Path(cf["path"]).read_text(encoding="utf-8")
         except (IOError, OSError):
             continue
 
@@ -405,31 +460,148 @@ def load_queue() -> List[Dict[str, Any]]:
 
 
 def save_queue(items: List[Dict[str, Any]]) -> None:
-    """Save learnings queue to file."""
+    """Save learnings queue to file.
+
+    Writes a temporary file next to the queue and renames it into place, so
+    an interrupted write never leaves a truncated queue behind. The JSON is
+    streamed to the file rather than built as one string first. A symlinked
+    queue keeps its link, and the file keeps its permissions.
+    """
+    import tempfile  # only needed here; keeps hook startup lean
+
     path = get_queue_path()
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(items, indent=2), encoding="utf-8")
+    # Replace the link target, not the link itself
+    path = Path(os.path.realpath(path))
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except OSError:
+        # New file: the mode a plain open() would give it under the umask
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(items, f, indent=2)
+        # mkstemp creates the file as 0600
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
 def append_to_queue(item: Dict[str, Any]) -> None:
-    """Append a single item to the queue."""
-    items = load_queue()
+    """Append a single item to the queue.
+
+    The queue stays a JSON array (commands read it with jq), but instead of
+    parsing and rewriting the whole file, the closing ']' is overwritten in
+    place so each capture writes only the new item. Falls back to a full
+    rewrite if the file does not end in a JSON array; a queue file that
+    cannot be parsed (e.g. a write cut short) is first moved aside to
+    '<queue>.corrupt-<timestamp>' so its items can still be recovered.
+    """
+    path = get_queue_path()
+    if path.exists():
+        if _append_in_place(path, item):
+            return
+        try:
+            items = json.loads(path.read_text(encoding="utf-8"))
+        except (ValueError, IOError):
+            items = []
+            try:
+                os.replace(path, path.with_name(f"{path.name}.corrupt-{backup_timestamp()}"))
+            except OSError:
+                pass
+    else:
+        items = []
     items.append(item)
     save_queue(items)
 
 
+@contextmanager
+def _exclusive_lock(f: IO[bytes]) -> Iterator[None]:
+    """Hold an exclusive lock on an open file, blocking until it is free.
+
+    Buffered writes are flushed before the lock is released.
+    """
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            f.flush()
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        # msvcrt locks a byte range from the current position; byte 0 stands
+        # in for the whole file
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.flush()
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _append_in_place(path: Path, item: Dict[str, Any]) -> bool:
+    """Splice item before the trailing ']' of a queue file. Returns False if not possible.
+
+    Holds an exclusive lock from reading the tail to writing the item, so
+    concurrent hooks cannot splice at the same offset.
+    """
+    entry = json.dumps(item, indent=2).replace("\n", "\n  ")
+    try:
+        with open(path, "r+b") as f, _exclusive_lock(f):
+            size = f.seek(0, os.SEEK_END)
+            tail_start = max(0, size - 64)
+            f.seek(tail_start)
+            tail = f.read()
+
+            close = tail.rfind(b"]")
+            if close == -1 or tail[close + 1:].strip():
+                return False
+            body = tail[:close].rstrip()
+            if not body:
+                return False
+
+            if body.endswith(b"["):
+                separator = b"\n  "
+            elif body.endswith((b"}", b"]", b'"')) or body[-1:].isalnum():
+                separator = b",\n  "
+            else:
+                return False
+
+            # Overwrite the old closing bracket without truncating first, so
+            # an interrupted write never leaves the earlier items unclosed
+            # and empty. Only trailing whitespace can be left to cut.
+            f.seek(tail_start + len(body))
+            f.write(separator + entry.encode("utf-8") + b"\n]")
+            if f.tell() < size:
+                f.truncate()
+        return True
+    except (IOError, OSError):
+        return False
+
+
 # =============================================================================
 # Timestamp utilities
 # =============================================================================
 
 def iso_timestamp() -> str:
     """Get current UTC timestamp in ISO 8601 format."""
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
 
 def backup_timestamp() -> str:
     """Get timestamp for backup filenames."""
-    return datetime.now().strftime("%Y%m%d-%H%M%S")
+    return time.strftime("%Y%m%d-%H%M%S", time.localtime())
 
 
 # =============================================================================
@@ -508,6 +680,125 @@ MAX_WEAK_PATTERN_LENGTH = 150
 MIN_SHORT_CORRECTION_LENGTH = 80
 
 
+def _alternation(patterns: List[str]) -> str:
+    """Join regex patterns into a single alternation, keeping each one grouped."""
+    return "|".join(f"(?:{p})" for p in patterns)
+
+
+def _lowercase_pattern(pattern: str) -> str:
+    """Lowercase the literal text of a regex, leaving escapes (\\S, \\W, ...) intact.
+
+    detect_patterns lowercases the message once and matches it against these,
+    which avoids re.IGNORECASE case folding on every pattern.
+    """
+    return re.sub(
+        r"\\.|[^\\]+",
+        lambda m: m.group() if m.group().startswith("\\") else m.group().lower(),
+        pattern,
+    )
+
+
+# Union of every pattern family used by detect_patterns. Most messages match
+# none of them; one search lets those skip the per-family loops entirely.
+_ANY_PATTERN_RE = re.compile(_lowercase_pattern(
+    _alternation(
+        [p for p, _, _, _ in EXPLICIT_PATTERNS]
+        + [p for p, _, _, _ in GUARDRAIL_PATTERNS]
+        + FALSE_POSITIVE_PATTERNS
+        + [p for p, _, _, _ in POSITIVE_PATTERNS]
+        + [p for p, _, _ in CORRECTION_PATTERNS]
+    )
+))
+
+# Compiled forms of the pattern tables above, built once at import.
+# All of them are matched against text.lower().
+_EXPLICIT_REGEXES = [
+    (re.compile(_lowercase_pattern(p)), name, confidence, decay)
+    for p, name, confidence, decay in EXPLICIT_PATTERNS
+]
+_GUARDRAIL_REGEXES = [
+    (re.compile(_lowercase_pattern(p)), name, confidence, decay)
+    for p, name, confidence, decay in GUARDRAIL_PATTERNS
+]
+
+# Any false-positive pattern disqualifies a message, so one alternation suffices
+_FALSE_POSITIVE_RE = re.compile(_lowercase_pattern(_alternation(FALSE_POSITIVE_PATTERNS)))
+
+# Every FALSE_POSITIVE_PATTERNS match contains at least one of these lowercase
+# literals; keep this in sync when adding patterns. Substring checks are much
+# cheaper than the regex, and most messages contain none of them.
+_FALSE_POSITIVE_LITERALS = (
+    "?", "\uff1f", "嗎", "吗", "呢", "か", "까",
+    "please", "can you", "could you", "would you", "help",
+    "fix", "check", "review", "figure out", "set up",
+    "error", "failed", "could not", "cannot", "can't", "unable to",
+    "not", "broken", "failing",
+    "i need", "i want", "i would like",
+    "ok", "alright",
+)
+
+# Positive patterns fused as zero-width lookaheads, like the unanchored
+# correction patterns below; no two of them can match at the same position
+_POSITIVE_RE = re.compile("|".join(
+    f"(?=(?P<p{i}>{_lowercase_pattern(p)}))" for i, (p, _, _, _) in enumerate(POSITIVE_PATTERNS)
+))
+
+# Group name -> (table index, name) for _POSITIVE_RE
+_POSITIVE_META = {f"p{i}": (i, name) for i, (_, name, _, _) in enumerate(POSITIVE_PATTERNS)}
+
+
+def _is_start_anchored(pattern: str) -> bool:
+    """True if every top-level alternative of pattern starts with '^'.
+
+    Splits naively on '|', so nested alternations read as unanchored, which
+    only costs the fast path, never correctness.
+    """
+    return all(alt.startswith("^") for alt in pattern.split("|"))
+
+
+def _correction_regexes(strong_only: bool) -> Tuple["re.Pattern[str]", "re.Pattern[str]"]:
+    """Build (anchored, unanchored) fused regexes over CORRECTION_PATTERNS.
+
+    Group "c<i>" is CORRECTION_PATTERNS[i]. Start-anchored patterns ("^no",
+    "^don't", ...) each begin with a different word, so at most one matches and
+    a single match() at position 0 finds it. The rest are zero-width lookaheads
+    for finditer: a match never consumes text another pattern needs, and as no
+    two of them can match at the same position, every pattern present is seen.
+    """
+    anchored, unanchored = [], []
+    for i, (p, _, is_strong) in enumerate(CORRECTION_PATTERNS):
+        if strong_only and not is_strong:
+            continue
+        lowered = _lowercase_pattern(p)
+        if _is_start_anchored(p):
+            anchored.append(f"(?P<c{i}>{lowered})")
+        else:
+            unanchored.append(f"(?=(?P<c{i}>{lowered}))")
+    # "(?!)" never matches, for a family left empty
+    return (
+        re.compile("|".join(anchored) or "(?!)"),
+        re.compile("|".join(unanchored) or "(?!)"),
+    )
+
+
+_CORRECTION_REGEXES = _correction_regexes(strong_only=False)
+
+# Group name -> (table index, name, is_strong) for the fused correction regexes
+_CORRECTION_META = {
+    f"c{i}": (i, name, is_strong)
+    for i, (_, name, is_strong) in enumerate(CORRECTION_PATTERNS)
+}
+
+# Weak patterns never count in messages longer than MAX_WEAK_PATTERN_LENGTH,
+# so those are scanned with the strong patterns only
+_STRONG_CORRECTION_REGEXES = _correction_regexes(strong_only=True)
+
+# Number of distinct messages whose classification is memoized per process.
+# Session scans see the same short replies ("continue", "yes", "perfect!") many times.
+DETECT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DETECT_CACHE_SIZE)
 def detect_patterns(text: str) -> Tuple[Optional[str], str, float, str, int]:
     """
     Detect patterns in text and return classification.
@@ -520,31 +811,40 @@ def detect_patterns(text: str) -> Tuple[Optional[str], str, float, str, int]:
         sentiment: "correction" or "positive"
         decay_days: Number of days until decay
     """
+    # Lowercase once; every compiled pattern is matched against this copy
+    lowered = text.lower()
+
+    # Single pass over all pattern families before checking each in priority order
+    has_match = _ANY_PATTERN_RE.search(lowered) is not None
+
     # Check for explicit "remember:" - always highest priority
-    for pattern, name, confidence, decay in EXPLICIT_PATTERNS:
-        if re.search(pattern, text, re.IGNORECASE):
-            return ("explicit", name, confidence, "correction", decay)
+    if has_match:
+        for regex, name, confidence, decay in _EXPLICIT_REGEXES:
+            if regex.search(lowered):
+                return ("explicit", name, confidence, "correction", decay)
 
     # Too short to be actionable (e.g. "廢話", "OK", "好")
     if len(text.strip()) <= 4:
         return (None, "", 0.0, "correction", 90)
 
+    # Nothing matched: queue for /reflect AI validation (see passthrough below)
+    if not has_match:
+        return ("auto", "regex:passthrough", 0.50, "correction", 90)
+
     # Check for guardrail patterns - "don't do X unless" constraints
     # These are high-confidence corrections about unwanted behavior
-    for pattern, name, confidence, decay in GUARDRAIL_PATTERNS:
-        if re.search(pattern, text, re.IGNORECASE):
+    for regex, name, confidence, decay in _GUARDRAIL_REGEXES:
+        if regex.search(lowered):
             return ("guardrail", name, confidence, "correction", decay)
 
     # Check for FALSE POSITIVE patterns - skip these messages
-    for fp_pattern in FALSE_POSITIVE_PATTERNS:
-        if re.search(fp_pattern, text, re.IGNORECASE):
-            return (None, "", 0.0, "correction", 90)
+    if (any(literal in lowered for literal in _FALSE_POSITIVE_LITERALS)
+            and _FALSE_POSITIVE_RE.search(lowered)):
+        return (None, "", 0.0, "correction", 90)
 
     # Check for positive patterns
-    matched_positive = []
-    for pattern, name, confidence, decay in POSITIVE_PATTERNS:
-        if re.search(pattern, text, re.IGNORECASE):
-            matched_positive.append(name)
+    positive_hits = {_POSITIVE_META[m.lastgroup] for m in _POSITIVE_RE.finditer(lowered)}
+    matched_positive = [name for _, name in sorted(positive_hits)]
 
     if matched_positive:
         return ("positive", " ".join(matched_positive), 0.70, "positive", 90)
@@ -558,17 +858,24 @@ def detect_patterns(text: str) -> Tuple[Optional[str], str, float, str, int]:
     has_strong_pattern = False
     has_i_told_you = False
 
-    for pattern, name, is_strong in CORRECTION_PATTERNS:
-        if re.search(pattern, text, re.IGNORECASE):
-            # Skip weak patterns in long messages
-            if not is_strong and text_length > MAX_WEAK_PATTERN_LENGTH:
-                continue
-            matched_corrections.append(name)
-            pattern_count += 1
-            if is_strong:
-                has_strong_pattern = True
-            if name == "I-told-you":
-                has_i_told_you = True
+    # Skip weak patterns in long messages
+    if text_length > MAX_WEAK_PATTERN_LENGTH:
+        anchored_re, unanchored_re = _STRONG_CORRECTION_REGEXES
+    else:
+        anchored_re, unanchored_re = _CORRECTION_REGEXES
+    correction_hits = {_CORRECTION_META[m.lastgroup] for m in unanchored_re.finditer(lowered)}
+    opener = anchored_re.match(lowered)
+    if opener:
+        correction_hits.add(_CORRECTION_META[opener.lastgroup])
+
+    # Sorting by table index keeps names in CORRECTION_PATTERNS order
+    for _, name, is_strong in sorted(correction_hits):
+        matched_corrections.append(name)
+        pattern_count += 1
+        if is_strong:
+            has_strong_pattern = True
+        if name == "I-told-you":
+            has_i_told_you = True
 
     if matched_corrections:
         # Calculate confidence based on pattern count, type, and length
@@ -629,6 +936,73 @@ def create_queue_item(
 # Session file utilities
 # =============================================================================
 
+# Read buffer for session JSONL files; session logs run to many megabytes and
+# the default buffer means far more read() calls per file
+SESSION_READ_BUFFER = 64 * 1024
+
+
+# Session files at least this large are memory-mapped instead of read
+MMAP_MIN_SIZE = 1024 * 1024
+
+
+def _iter_session_lines(session_file: Path) -> Iterator[bytes]:
+    """Yield the raw lines of a session JSONL file.
+
+    Large files are memory-mapped and split with mmap.readline, which skips
+    copying the data through a read buffer first.
+    """
+    with open(session_file, "rb", buffering=SESSION_READ_BUFFER) as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None
+            if mapped is not None:
+                with mapped:
+                    yield from iter(mapped.readline, b"")
+                return
+        yield from f
+
+
+# Correction phrases used by extract_user_messages(corrections_only=True),
+# matched against the lowercased message
+_CORRECTION_FILTER_RE = re.compile(_lowercase_pattern(
+    r"(no,? use|don't use|stop using|never use|that's wrong|that's incorrect|"
+    r"not right|not correct|actually[,. ]|I meant|I said|I told you|"
+    r"I already told|you should use|you need to use|use .+ not|not .+, use|remember:)"
+))
+
+
+def _user_messages_in(entry: Dict[str, Any]) -> List[str]:
+    """Return the includable user message texts of one parsed session entry."""
+    # Filter: type=user, not isMeta
+    if entry.get("type") != "user":
+        return []
+    if entry.get("isMeta"):
+        return []
+
+    messages = []
+
+    # Extract text from content (can be string or list)
+    content = entry.get("message", {}).get("content", [])
+
+    # Handle string content directly
+    if isinstance(content, str):
+        if content and _should_include_message(content):
+            messages.append(content)
+    # Handle list of content items
+    elif isinstance(content, list):
+        for item in content:
+            if isinstance(item, dict) and item.get("type") == "text":
+                text = item.get("text", "")
+                if text:
+                    # Apply filters (same as bash script)
+                    if _should_include_message(text):
+                        messages.append(text)
+
+    return messages
+
+
 def extract_user_messages(session_file: Path, corrections_only: bool = False) -> List[str]:
     """
     Extract user messages from a Claude Code session file (JSONL format).
@@ -646,54 +1020,91 @@ def extract_user_messages(session_file: Path, corrections_only: bool = False) ->
     messages = []
 
     try:
-        with open(session_file, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                # Filter: type=user, not isMeta
-                if entry.get("type") != "user":
-                    continue
-                if entry.get("isMeta"):
-                    continue
-
-                # Extract text from content (can be string or list)
-                content = entry.get("message", {}).get("content", [])
-
-                # Handle string content directly
-                if isinstance(content, str):
-                    if content and _should_include_message(content):
-                        messages.append(content)
-                # Handle list of content items
-                elif isinstance(content, list):
-                    for item in content:
-                        if isinstance(item, dict) and item.get("type") == "text":
-                            text = item.get("text", "")
-                            if text:
-                                # Apply filters (same as bash script)
-                                if _should_include_message(text):
-                                    messages.append(text)
+        for line in _iter_session_lines(session_file):
+            # Cheap byte check before parsing: user entries always contain "user"
+            if b'"user"' not in line:
+                continue
+
+            # Parse the raw UTF-8 bytes directly; blank, malformed and
+            # undecodable lines all raise ValueError
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+
+            messages.extend(_user_messages_in(entry))
     except IOError:
         return []
 
     if corrections_only:
         # Filter for correction patterns
-        correction_pattern = (
-            r"(no,? use|don't use|stop using|never use|that's wrong|that's incorrect|"
-            r"not right|not correct|actually[,. ]|I meant|I said|I told you|"
-            r"I already told|you should use|you need to use|use .+ not|not .+, use|remember:)"
-        )
-        messages = [m for m in messages if re.search(correction_pattern, m, re.IGNORECASE)]
+        messages = [m for m in messages if _CORRECTION_FILTER_RE.search(m.lower())]
 
     return messages
 
 
+# Below this many files, worker start-up costs more than the scan itself
+PARALLEL_SCAN_MIN_FILES = 8
+
+
+def _map_session_files(func, session_files: List[Path]) -> List[Any]:
+    """Apply func to each session file, across processes when there are many.
+
+    Results are returned in the same order as session_files. Falls back to
+    a serial loop for small batches or when a process pool is unavailable.
+    """
+    session_files = list(session_files)
+    workers = os.cpu_count() or 1
+    if len(session_files) < PARALLEL_SCAN_MIN_FILES or workers < 2:
+        return [func(f) for f in session_files]
+
+    # Imported here so hooks that never scan many sessions don't pay for
+    # loading multiprocessing at startup
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(session_files))) as executor:
+            return list(executor.map(func, session_files))
+    except (OSError, BrokenProcessPool):
+        return [func(f) for f in session_files]
+
+
+def extract_user_messages_many(
+    session_files: List[Path], corrections_only: bool = False
+) -> List[List[str]]:
+    """
+    Run extract_user_messages() over many session files in parallel.
+
+    Returns:
+        One list of messages per session file, in input order
+    """
+    return _map_session_files(
+        partial(extract_user_messages, corrections_only=corrections_only),
+        session_files,
+    )
+
+
+# Messages starting with or containing any of these are system content,
+# not user corrections
+_SKIP_MESSAGE_PREFIXES = (
+    "<",                # XML tags (<task-notification>, <system-reminder>, etc.)
+    "[",                # Brackets
+    "{",                # JSON
+    "Analysis:",
+    "**",               # Bold text
+    "   -",             # Indented lists
+)
+_SKIP_MESSAGE_SUBSTRINGS = (
+    "tool_result",
+    "tool_use_id",
+    "<command-",
+    "<task-notification>",
+    "<system-reminder>",
+    "This session is being continued",
+)
+
+
 def should_include_message(text: str) -> bool:
     """Check if a message should be included in learning detection.
 
@@ -706,33 +1117,73 @@ def should_include_message(text: str) -> bool:
     if not text.strip():
         return False
 
-    # Skip lines starting with certain patterns
-    skip_patterns = [
-        r"^<",              # XML tags (<task-notification>, <system-reminder>, etc.)
-        r"^\[",             # Brackets
-        r"^\{",             # JSON
-        r"tool_result",
-        r"tool_use_id",
-        r"<command-",
-        r"<task-notification>",
-        r"<system-reminder>",
-        r"This session is being continued",
-        r"^Analysis:",
-        r"^\*\*",           # Bold text
-        r"^   -",           # Indented lists
-    ]
-
-    for pattern in skip_patterns:
-        if re.search(pattern, text):
-            return False
-
-    return True
+    # Skip lines starting with or containing system markers
+    if text.startswith(_SKIP_MESSAGE_PREFIXES):
+        return False
+
+    return not any(marker in text for marker in _SKIP_MESSAGE_SUBSTRINGS)
 
 
 # Backward-compatible alias
 _should_include_message = should_include_message
 
 
+# Text Claude Code puts in the tool_result when the user rejects a tool call
+_REJECTION_MARKER = "The user doesn't want to proceed"
+_REJECTION_MARKER_BYTES = _REJECTION_MARKER.encode("utf-8")
+
+# Precedes the user's feedback in a rejection; searched without lowercasing a copy
+_USER_SAID_RE = re.compile(r"the user said:", re.IGNORECASE)
+
+
+def _rejections_in(entry: Dict[str, Any]) -> List[str]:
+    """Return the user feedback from tool rejections in one parsed session entry."""
+    # Must be a user entry (matches bash: select(.type=="user"))
+    if entry.get("type") != "user":
+        return []
+
+    # Get message.content array (matches bash: select(.message.content | type == "array"))
+    content = entry.get("message", {}).get("content", [])
+    if not isinstance(content, list):
+        return []
+
+    rejections = []
+
+    # Look for tool_result items in content array
+    for item in content:
+        if not isinstance(item, dict):
+            continue
+
+        # Must be type == "tool_result" (matches bash: select(.type=="tool_result"))
+        if item.get("type") != "tool_result":
+            continue
+
+        # Must have is_error == true (matches bash: select(.is_error==true))
+        if not item.get("is_error"):
+            continue
+
+        # Get the content string
+        tool_content = item.get("content", "")
+        if not isinstance(tool_content, str):
+            continue
+
+        # Must contain rejection message (matches bash: select(.content | contains(...)))
+        if _REJECTION_MARKER not in tool_content:
+            continue
+
+        # Extract text after "the user said:" (matches bash: awk '/the user said:/{getline; print}')
+        # Note: bash uses lowercase "the user said:", let's be case-insensitive
+        said = _USER_SAID_RE.search(tool_content)
+        if said:
+            after_marker = tool_content[said.end():]
+            # Get the next line (bash uses getline)
+            lines = after_marker.strip().split("\n")
+            if lines and lines[0].strip():
+                rejections.append(lines[0].strip())
+
+    return rejections
+
+
 def extract_tool_rejections(session_file: Path) -> List[str]:
     """
     Extract user corrections from tool rejections in session files.
@@ -755,59 +1206,19 @@ def extract_tool_rejections(session_file: Path) -> List[str]:
     rejections = []
 
     try:
-        with open(session_file, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                # Must be a user entry (matches bash: select(.type=="user"))
-                if entry.get("type") != "user":
-                    continue
-
-                # Get message.content array (matches bash: select(.message.content | type == "array"))
-                content = entry.get("message", {}).get("content", [])
-                if not isinstance(content, list):
-                    continue
-
-                # Look for tool_result items in content array
-                for item in content:
-                    if not isinstance(item, dict):
-                        continue
-
-                    # Must be type == "tool_result" (matches bash: select(.type=="tool_result"))
-                    if item.get("type") != "tool_result":
-                        continue
-
-                    # Must have is_error == true (matches bash: select(.is_error==true))
-                    if not item.get("is_error"):
-                        continue
-
-                    # Get the content string
-                    tool_content = item.get("content", "")
-                    if not isinstance(tool_content, str):
-                        continue
-
-                    # Must contain rejection message (matches bash: select(.content | contains(...)))
-                    if "The user doesn't want to proceed" not in tool_content:
-                        continue
-
-                    # Extract text after "the user said:" (matches bash: awk '/the user said:/{getline; print}')
-                    # Note: bash uses lowercase "the user said:", let's be case-insensitive
-                    lower_content = tool_content.lower()
-                    if "the user said:" in lower_content:
-                        # Find the position case-insensitively
-                        idx = lower_content.find("the user said:")
-                        after_marker = tool_content[idx + len("the user said:"):]
-                        # Get the next line (bash uses getline)
-                        lines = after_marker.strip().split("\n")
-                        if lines and lines[0].strip():
-                            rejections.append(lines[0].strip())
+        for line in _iter_session_lines(session_file):
+            # Cheap byte check before parsing: skip lines without a rejection
+            if _REJECTION_MARKER_BYTES not in line:
+                continue
+
+            # Parse the raw UTF-8 bytes directly; blank, malformed and
+            # undecodable lines all raise ValueError
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+
+            rejections.extend(_rejections_in(entry))
 
     except IOError:
         return []
@@ -840,8 +1251,10 @@ PROJECT_SPECIFIC_ERROR_PATTERNS = [
     ("connection_refused",
      r"Connection refused|ECONNREFUSED|connect ECONNREFUSED",
      "Check .env for service URLs - don't assume localhost"),
+    # "\w_URL" rather than "\w+_URL": matches the same errors, without
+    # quadratic backtracking over long words (base64 blobs, minified code)
     ("env_undefined",
-     r"(\w+_URL|DATABASE_URL|API_KEY|SECRET).*undefined|not set|is not defined",
+     r"(\w_URL|DATABASE_URL|API_KEY|SECRET).*undefined|not set|is not defined",
      "Load .env file before accessing environment variables"),
     # Database-specific errors
     ("supabase_error",
@@ -866,6 +1279,86 @@ PROJECT_SPECIFIC_ERROR_PATTERNS = [
      "Check if service is already running on this port"),
 ]
 
+# Compiled forms of the two tables above, built once at import.
+# Both are matched against the lowercased tool output.
+_TOOL_ERROR_EXCLUDE_REGEXES = [
+    re.compile(_lowercase_pattern(p)) for p in TOOL_ERROR_EXCLUDE_PATTERNS
+]
+_PROJECT_SPECIFIC_ERROR_REGEXES = [
+    (etype, re.compile(_lowercase_pattern(p)), guideline)
+    for etype, p, guideline in PROJECT_SPECIFIC_ERROR_PATTERNS
+]
+
+
+def _tool_errors_in(
+    entry: Dict[str, Any],
+    project: str,
+    project_specific_only: bool,
+) -> List[Dict[str, Any]]:
+    """Return the tool execution errors in one parsed session entry."""
+    # Must be a user entry (tool results come back as user messages)
+    if entry.get("type") != "user":
+        return []
+
+    # Get message.content array
+    content = entry.get("message", {}).get("content", [])
+    if not isinstance(content, list):
+        return []
+
+    errors = []
+
+    # Look for tool_result items with is_error
+    for item in content:
+        if not isinstance(item, dict):
+            continue
+
+        if item.get("type") != "tool_result":
+            continue
+
+        if not item.get("is_error"):
+            continue
+
+        tool_content = item.get("content", "")
+        if not isinstance(tool_content, str):
+            continue
+
+        # Lowercase once; the compiled pattern tables are all lowercase
+        lowered = tool_content.lower()
+
+        # Skip if matches exclude patterns
+        should_exclude = False
+        for exclude_regex in _TOOL_ERROR_EXCLUDE_REGEXES:
+            if exclude_regex.search(lowered):
+                should_exclude = True
+                break
+
+        if should_exclude:
+            continue
+
+        # If project_specific_only, check for matching patterns
+        error_type = "unknown"
+        suggested_guideline = None
+
+        for etype, regex, guideline in _PROJECT_SPECIFIC_ERROR_REGEXES:
+            if regex.search(lowered):
+                error_type = etype
+                suggested_guideline = guideline
+                break
+
+        # Skip unknown errors if project_specific_only
+        if project_specific_only and error_type == "unknown":
+            continue
+
+        errors.append({
+            "error_type": error_type,
+            "content": tool_content[:500],  # Truncate long errors
+            "project": project,
+            "timestamp": entry.get("timestamp", ""),
+            "suggested_guideline": suggested_guideline,
+        })
+
+    return errors
+
 
 def extract_tool_errors(
     session_file: Path,
@@ -890,74 +1383,23 @@ def extract_tool_errors(
         return []
 
     errors = []
+    project = str(session_file.parent.name)
 
     try:
-        with open(session_file, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                # Must be a user entry (tool results come back as user messages)
-                if entry.get("type") != "user":
-                    continue
-
-                # Get message.content array
-                content = entry.get("message", {}).get("content", [])
-                if not isinstance(content, list):
-                    continue
-
-                # Look for tool_result items with is_error
-                for item in content:
-                    if not isinstance(item, dict):
-                        continue
-
-                    if item.get("type") != "tool_result":
-                        continue
-
-                    if not item.get("is_error"):
-                        continue
-
-                    tool_content = item.get("content", "")
-                    if not isinstance(tool_content, str):
-                        continue
-
-                    # Skip if matches exclude patterns
-                    should_exclude = False
-                    for exclude_pattern in TOOL_ERROR_EXCLUDE_PATTERNS:
-                        if re.search(exclude_pattern, tool_content, re.IGNORECASE):
-                            should_exclude = True
-                            break
-
-                    if should_exclude:
-                        continue
-
-                    # If project_specific_only, check for matching patterns
-                    error_type = "unknown"
-                    suggested_guideline = None
-
-                    for etype, pattern, guideline in PROJECT_SPECIFIC_ERROR_PATTERNS:
-                        if re.search(pattern, tool_content, re.IGNORECASE):
-                            error_type = etype
-                            suggested_guideline = guideline
-                            break
-
-                    # Skip unknown errors if project_specific_only
-                    if project_specific_only and error_type == "unknown":
-                        continue
-
-                    errors.append({
-                        "error_type": error_type,
-                        "content": tool_content[:500],  # Truncate long errors
-                        "project": str(session_file.parent.name),
-                        "timestamp": entry.get("timestamp", ""),
-                        "suggested_guideline": suggested_guideline,
-                    })
+        for line in _iter_session_lines(session_file):
+            # Cheap byte check before parsing: errors are tool_result items
+            # carrying an is_error flag
+            if b'"tool_result"' not in line or b'"is_error"' not in line:
+                continue
+
+            # Parse the raw UTF-8 bytes directly; blank, malformed and
+            # undecodable lines all raise ValueError
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+
+            errors.extend(_tool_errors_in(entry, project, project_specific_only))
 
     except IOError:
         return []
@@ -965,6 +1407,22 @@ def extract_tool_errors(
     return errors
 
 
+def extract_tool_errors_many(
+    session_files: List[Path],
+    project_specific_only: bool = True
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run extract_tool_errors() over many session files in parallel.
+
+    Returns:
+        One list of error dicts per session file, in input order
+    """
+    return _map_session_files(
+        partial(extract_tool_errors, project_specific_only=project_specific_only),
+        session_files,
+    )
+
+
 def aggregate_tool_errors(
     errors: List[Dict[str, Any]],
     min_occurrences: int = 2
@@ -982,26 +1440,21 @@ def aggregate_tool_errors(
         List of aggregated errors with {error_type, count, suggested_guideline,
         confidence, sample_errors}
     """
-    from collections import Counter
-
-    # Count by error type
-    type_counts = Counter(e["error_type"] for e in errors)
+    from collections import defaultdict
 
-    # Group errors by type
-    errors_by_type: Dict[str, List[Dict]] = {}
+    # Group errors by type in one pass; counts come from the group sizes
+    errors_by_type: Dict[str, List[Dict]] = defaultdict(list)
     for error in errors:
-        etype = error["error_type"]
-        if etype not in errors_by_type:
-            errors_by_type[etype] = []
-        errors_by_type[etype].append(error)
+        errors_by_type[error["error_type"]].append(error)
 
     # Build aggregated results for types meeting threshold
     aggregated = []
-    for error_type, count in type_counts.items():
+    for error_type, type_errors in errors_by_type.items():
+        count = len(type_errors)
         if count < min_occurrences:
             continue
 
-        samples = errors_by_type[error_type][:3]  # Keep up to 3 samples
+        samples = type_errors[:3]  # Keep up to 3 samples
         suggested_guideline = samples[0].get("suggested_guideline") if samples else None
 
         # Higher confidence for more occurrences
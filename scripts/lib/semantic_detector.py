@@ -7,6 +7,9 @@ and determine if they contain reusable learnings.
 import json
 import subprocess
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 
 # Default timeout for Claude CLI calls (seconds)
@@ -17,6 +20,24 @@ DEFAULT_TIMEOUT = 30
 # Override via --model flag in /reflect or model parameter in API calls.
 DEFAULT_MODEL = "sonnet"
 
+# Most Claude CLI calls run at once when validating a batch; each call is
+# a separate process waiting on the network, so they overlap well
+MAX_CONCURRENT_CALLS = 4
+
+# Most semantic_analyze() results kept in memory, keyed by (text, model).
+# A repeated message (e.g. the same correction queued twice) then skips the
+# CLI call; failures are not cached so they are retried.
+SEMANTIC_CACHE_SIZE = 1024
+_semantic_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_semantic_cache_lock = threading.Lock()
+
+
+def clear_semantic_cache() -> None:
+    """Forget cached semantic_analyze() results."""
+    with _semantic_cache_lock:
+        _semantic_cache.clear()
+
+
 # Semantic analysis prompt template
 ANALYSIS_PROMPT = """Analyze this user message from a coding session. Determine if it contains
 a reusable learning, correction, or preference that should be remembered for future sessions.
@@ -69,11 +90,49 @@ def semantic_analyze(
     if not text or not text.strip():
         return None
 
+    # System content (XML tags, tool results, session continuations) is never
+    # a learning; answer that directly instead of making the CLI round-trip
+    try:
+        from .reflect_utils import should_include_message
+    except ImportError:  # run directly as a script, not as part of lib
+        from reflect_utils import should_include_message
+    if not should_include_message(text):
+        return {
+            "is_learning": False,
+            "type": None,
+            "confidence": 0.0,
+            "reasoning": "system content",
+            "extracted_learning": None,
+        }
+
+    # Use DEFAULT_MODEL if no explicit model specified
+    effective_model = model or DEFAULT_MODEL
+
+    cache_key = (text, effective_model)
+    with _semantic_cache_lock:
+        cached = _semantic_cache.get(cache_key)
+        if cached is not None:
+            _semantic_cache.move_to_end(cache_key)
+            return dict(cached)
+
+    result = _run_semantic_analysis(text, timeout, effective_model)
+    if result is not None:
+        with _semantic_cache_lock:
+            _semantic_cache[cache_key] = dict(result)
+            if len(_semantic_cache) > SEMANTIC_CACHE_SIZE:
+                _semantic_cache.popitem(last=False)
+    return result
+
+
+def _run_semantic_analysis(
+    text: str,
+    timeout: int,
+    effective_model: Optional[str],
+) -> Optional[Dict[str, Any]]:
+    """Run the Claude CLI analysis for semantic_analyze() (uncached)."""
     # Build the prompt
     prompt = ANALYSIS_PROMPT.format(text=text.replace('"', '\\"'))
 
-    # Build command — use DEFAULT_MODEL if no explicit model specified
-    effective_model = model or DEFAULT_MODEL
     cmd = ["claude", "-p", "--output-format", "json"]
     if effective_model:
         cmd.extend(["--model", effective_model])
@@ -124,6 +183,17 @@ def semantic_analyze(
         return None
 
 
+def _map_concurrently(func, items: list) -> list:
+    """Apply func to each item, running up to MAX_CONCURRENT_CALLS at once.
+
+    Results are returned in the same order as items.
+    """
+    if len(items) < 2:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_CALLS, len(items))) as executor:
+        return list(executor.map(func, items))
+
+
 def _extract_json_from_text(text: str) -> Optional[Dict[str, Any]]:
     """Try to extract JSON from text that may have surrounding content."""
     # Find JSON object boundaries
@@ -203,15 +273,15 @@ def validate_queue_items(
         Filtered and enhanced list of queue items
     """
     validated = []
+    items = [item for item in items if item.get("message", "")]
 
-    for item in items:
-        message = item.get("message", "")
-        if not message:
-            continue
-
-        # Run semantic analysis
-        result = semantic_analyze(message, timeout=timeout, model=model)
+    # Run semantic analysis, overlapping the CLI round-trips
+    results = _map_concurrently(
+        lambda item: semantic_analyze(item["message"], timeout=timeout, model=model),
+        items,
+    )
 
+    for item, result in zip(items, results):
         if result is None:
             # Fallback: keep original item if semantic fails
             validated.append(item)
@@ -387,23 +457,23 @@ def validate_tool_errors(
     """
     validated = []
 
-    for error in aggregated_errors:
-        error_type = error.get("error_type", "unknown")
+    def validate(error: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         sample_errors = error.get("sample_errors", [])
-        sample_error = sample_errors[0] if sample_errors else ""
-        count = error.get("count", 1)
-        suggested = error.get("suggested_guideline", "")
-
-        # Run semantic validation
-        result = validate_tool_error(
-            error_type=error_type,
-            sample_error=sample_error,
-            count=count,
-            suggested_guideline=suggested,
+        return validate_tool_error(
+            error_type=error.get("error_type", "unknown"),
+            sample_error=sample_errors[0] if sample_errors else "",
+            count=error.get("count", 1),
+            suggested_guideline=error.get("suggested_guideline", ""),
             timeout=timeout,
             model=model
         )
 
+    # Run semantic validation, overlapping the CLI round-trips
+    results = _map_concurrently(validate, aggregated_errors)
+
+    for error, result in zip(aggregated_errors, results):
+        suggested = error.get("suggested_guideline", "")
+
         if result is None:
             # Fallback: keep original if semantic fails
             validated.append(error)
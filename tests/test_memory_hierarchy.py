@@ -87,6 +87,16 @@ class TestParseRuleFrontmatter(unittest.TestCase):
         result = _parse_rule_frontmatter(Path("/nonexistent/rule.md"))
         self.assertIsNone(result)
 
+    def test_frontmatter_longer_than_read_head(self):
+        """Test frontmatter extending past the initial read is still parsed."""
+        f = Path(self.temp_dir) / "rule.md"
+        paths = [f"src/module_{i}/" for i in range(1000)]
+        body = "".join(f"  - {p}\n" for p in paths)
+        f.write_text(f"---\npaths:\n{body}---\n\nContent\n")
+        result = _parse_rule_frontmatter(f)
+        self.assertIsNotNone(result)
+        self.assertEqual(result["paths"], paths)
+
 
 class TestFindClaudeFilesRules(unittest.TestCase):
     """Tests for find_claude_files() with rules, local, and user-rules."""
@@ -274,6 +284,22 @@ class TestAutoMemoryPath(unittest.TestCase):
         result = get_project_folder_name("/Users/bob/code/projects/myapp")
         self.assertEqual(result, "-Users-bob-code-projects-myapp")
 
+    def test_folder_name_follows_cwd(self):
+        """Test the default (cwd) folder name tracks directory changes."""
+        import shutil
+        original_cwd = os.getcwd()
+        first, second = tempfile.mkdtemp(), tempfile.mkdtemp()
+        try:
+            os.chdir(first)
+            self.assertEqual(get_project_folder_name(), get_project_folder_name(first))
+            os.chdir(second)
+            self.assertEqual(get_project_folder_name(), get_project_folder_name(second))
+            self.assertNotEqual(get_project_folder_name(first), get_project_folder_name(second))
+        finally:
+            os.chdir(original_cwd)
+            shutil.rmtree(first, ignore_errors=True)
+            shutil.rmtree(second, ignore_errors=True)
+
     @patch("lib.reflect_utils.get_claude_dir")
     def test_auto_memory_path_resolution(self, mock_claude_dir):
         """Test auto memory path is correctly resolved."""
@@ -377,6 +403,35 @@ class TestReadAllMemoryEntries(unittest.TestCase):
         self.assertTrue(len(root_entries) > 0)
         self.assertEqual(global_entries[0]["source_file"], "~/.claude/CLAUDE.md")
 
+    @patch("lib.reflect_utils.get_claude_dir")
+    def test_line_numbers(self, mock_claude_dir):
+        """Test that bullet line numbers match the file, with any line endings."""
+        fake_claude = Path(self.temp_dir) / "fake_claude"
+        fake_claude.mkdir()
+        mock_claude_dir.return_value = fake_claude
+
+        for newline in ("\n", "\r\n", "\r"):
+            content = newline.join(["- First", "# Heading", "", "  - Indented  ", "-   ", "- Last"])
+            (Path(self.temp_dir) / "CLAUDE.md").write_bytes(content.encode("utf-8"))
+
+            entries = read_all_memory_entries(self.temp_dir)
+            found = [(e["line_number"], e["text"]) for e in entries]
+            self.assertEqual(found, [(1, "First"), (4, "Indented"), (6, "Last")], repr(newline))
+
+    @patch("lib.reflect_utils.get_claude_dir")
+    def test_reuses_given_claude_files(self, mock_claude_dir):
+        """Test that passing find_claude_files() results skips a second tree walk."""
+        fake_claude = Path(self.temp_dir) / "fake_claude"
+        fake_claude.mkdir()
+        mock_claude_dir.return_value = fake_claude
+        (Path(self.temp_dir) / "CLAUDE.md").write_text("# Project\n- Use postgres\n")
+
+        files = find_claude_files(self.temp_dir)
+        with patch("lib.reflect_utils.find_claude_files") as mock_find:
+            entries = read_all_memory_entries(self.temp_dir, claude_files=files)
+        mock_find.assert_not_called()
+        self.assertIn("Use postgres", [e["text"] for e in entries])
+
     @patch("lib.reflect_utils.get_claude_dir")
     def test_missing_files_no_error(self, mock_claude_dir):
         """Test that missing files don't cause errors."""
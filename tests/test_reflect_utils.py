@@ -23,6 +23,7 @@ from lib.reflect_utils import (
     detect_patterns,
     create_queue_item,
     extract_user_messages,
+    extract_user_messages_many,
     extract_tool_rejections,
     find_claude_files,
     suggest_claude_file,
@@ -98,6 +99,43 @@ class TestQueueOperations(unittest.TestCase):
         saved_data = json.loads(self.test_queue_path.read_text())
         self.assertEqual(saved_data, test_items)
 
+    @patch("lib.reflect_utils.get_queue_path")
+    def test_save_queue_replaces_without_leftovers(self, mock_path):
+        """Test saving over an existing queue leaves only the queue file."""
+        mock_path.return_value = self.test_queue_path
+        self.test_queue_path.write_text("[]")
+
+        save_queue([{"type": "auto", "message": "test"}])
+
+        self.assertEqual(os.listdir(self.temp_dir), ["learnings-queue.json"])
+        self.assertEqual(len(json.loads(self.test_queue_path.read_text())), 1)
+
+    @unittest.skipIf(os.name == "nt", "POSIX permission bits")
+    @patch("lib.reflect_utils.get_queue_path")
+    def test_save_queue_keeps_file_mode(self, mock_path):
+        """Test saving over an existing queue keeps its permissions."""
+        mock_path.return_value = self.test_queue_path
+        self.test_queue_path.write_text("[]")
+        os.chmod(self.test_queue_path, 0o644)
+
+        save_queue([{"type": "auto", "message": "test"}])
+
+        self.assertEqual(os.stat(self.test_queue_path).st_mode & 0o777, 0o644)
+
+    @unittest.skipIf(os.name == "nt", "symlinks need extra privileges on Windows")
+    @patch("lib.reflect_utils.get_queue_path")
+    def test_save_queue_keeps_symlink(self, mock_path):
+        """Test saving through a symlinked queue updates the target, not the link."""
+        target = Path(self.temp_dir) / "real-queue.json"
+        target.write_text("[]")
+        self.test_queue_path.symlink_to(target)
+        mock_path.return_value = self.test_queue_path
+
+        save_queue([{"type": "auto", "message": "test"}])
+
+        self.assertTrue(self.test_queue_path.is_symlink())
+        self.assertEqual(len(json.loads(target.read_text())), 1)
+
     @patch("lib.reflect_utils.get_queue_path")
     def test_append_to_queue(self, mock_path):
         """Test appending to queue."""
@@ -111,6 +149,81 @@ class TestQueueOperations(unittest.TestCase):
         self.assertEqual(len(saved_data), 1)
         self.assertEqual(saved_data[0]["message"], "new item")
 
+    @patch("lib.reflect_utils.get_queue_path")
+    def test_append_to_existing_queue_keeps_json_array(self, mock_path):
+        """Test repeated appends to a saved queue keep a valid JSON array."""
+        mock_path.return_value = self.test_queue_path
+        save_queue([{"type": "auto", "message": "first"}])
+
+        append_to_queue({"type": "auto", "message": "second"})
+        append_to_queue({"type": "explicit", "message": "third"})
+
+        saved_data = json.loads(self.test_queue_path.read_text())
+        self.assertEqual([i["message"] for i in saved_data], ["first", "second", "third"])
+
+    @patch("lib.reflect_utils.get_queue_path")
+    def test_append_to_corrupt_queue_rewrites(self, mock_path):
+        """Test appending to a file that is not a JSON array starts a fresh queue."""
+        mock_path.return_value = self.test_queue_path
+        self.test_queue_path.write_text("{not json")
+
+        append_to_queue({"type": "auto", "message": "new item"})
+
+        saved_data = json.loads(self.test_queue_path.read_text())
+        self.assertEqual(saved_data, [{"type": "auto", "message": "new item"}])
+
+    def test_concurrent_appends_keep_valid_queue(self):
+        """Test appends from racing processes neither corrupt the queue nor drop items."""
+        import subprocess
+
+        self.test_queue_path.write_text("[]")
+        script = (
+            "import sys; sys.path.insert(0, sys.argv[1])\n"
+            "from pathlib import Path\n"
+            "from lib.reflect_utils import _append_in_place\n"
+            "for i in range(200):\n"
+            "    assert _append_in_place(Path(sys.argv[2]),"
+            " {'message': sys.argv[3] + str(i) + 'x' * int(sys.argv[4])})\n"
+        )
+        scripts_dir = str(Path(__file__).parent.parent / "scripts")
+        procs = [
+            subprocess.Popen([sys.executable, "-c", script, scripts_dir,
+                              str(self.test_queue_path), name, pad])
+            for name, pad in (("a", "200"), ("b", "0"))
+        ]
+        for proc in procs:
+            self.assertEqual(proc.wait(), 0)
+
+        saved_data = json.loads(self.test_queue_path.read_text())
+        self.assertEqual(len(saved_data), 400)
+
+    @patch("lib.reflect_utils.get_queue_path")
+    def test_append_to_unclosed_queue_keeps_old_items(self, mock_path):
+        """Test a queue file cut off before its ']' is set aside, not overwritten."""
+        mock_path.return_value = self.test_queue_path
+        save_queue([{"type": "auto", "message": "first"}])
+        unclosed = self.test_queue_path.read_text().rstrip().rstrip("]")
+        self.test_queue_path.write_text(unclosed)
+
+        append_to_queue({"type": "auto", "message": "new item"})
+
+        saved_data = json.loads(self.test_queue_path.read_text())
+        self.assertEqual(saved_data, [{"type": "auto", "message": "new item"}])
+        corrupt = [p for p in Path(self.temp_dir).iterdir() if ".corrupt-" in p.name]
+        self.assertEqual(len(corrupt), 1)
+        self.assertEqual(corrupt[0].read_text(), unclosed)
+
+    @patch("lib.reflect_utils.get_queue_path")
+    def test_append_in_place_trims_trailing_whitespace(self, mock_path):
+        """Test that a long whitespace tail after ']' does not survive an append."""
+        mock_path.return_value = self.test_queue_path
+        self.test_queue_path.write_text("[]" + " " * 40 + "\n")
+
+        append_to_queue({})
+
+        self.assertEqual(json.loads(self.test_queue_path.read_text()), [{}])
+        self.assertTrue(self.test_queue_path.read_text().endswith("]"))
+
 
 class TestTimestampUtilities(unittest.TestCase):
     """Tests for timestamp functions."""
@@ -350,6 +463,21 @@ class TestPatternDetection(unittest.TestCase):
         result = detect_patterns("這是什麼？")
         self.assertIsNone(result[0])
 
+    def test_unmatched_english_message_passes_through(self):
+        """Test that a message matching no pattern family is queued as passthrough."""
+        result = detect_patterns("the staging bucket holds the uploads")
+        self.assertEqual(result, ("auto", "regex:passthrough", 0.50, "correction", 90))
+
+    # --- Memoization ---
+
+    def test_repeated_message_served_from_cache(self):
+        """Test that classifying the same text twice reuses the first result."""
+        detect_patterns.cache_clear()
+        first = detect_patterns("no, use tabs")
+        second = detect_patterns("no, use tabs")
+        self.assertEqual(first, second)
+        self.assertEqual(detect_patterns.cache_info().hits, 1)
+
 
 class TestQueueItemCreation(unittest.TestCase):
     """Tests for queue item creation."""
@@ -503,11 +631,43 @@ class TestSessionExtraction(unittest.TestCase):
         self.assertIn("no, use Python", messages)
         self.assertIn("remember: always test", messages)
 
+    def test_extract_user_messages_memory_mapped(self):
+        """Test large (memory-mapped) session files give the same messages."""
+        from lib import reflect_utils
+
+        session_data = [
+            {"type": "user", "message": {"content": "first message"}},
+            {"type": "assistant", "message": {"content": "Response"}},
+            {"type": "user", "message": {"content": "no, use Python instead"}},
+        ]
+        with open(self.session_file, "w") as f:
+            for entry in session_data:
+                f.write(json.dumps(entry) + "\n")
+
+        expected = extract_user_messages(self.session_file)
+        with patch.object(reflect_utils, "MMAP_MIN_SIZE", 1):
+            messages = extract_user_messages(self.session_file)
+        self.assertEqual(messages, expected)
+        self.assertEqual(messages, ["first message", "no, use Python instead"])
+
     def test_extract_nonexistent_file(self):
         """Test extracting from nonexistent file returns empty list."""
         messages = extract_user_messages(Path("/nonexistent/file.jsonl"))
         self.assertEqual(messages, [])
 
+    def test_extract_user_messages_many_keeps_file_order(self):
+        """Test batch extraction returns one result per file, in input order."""
+        session_files = []
+        for i in range(10):
+            path = Path(self.temp_dir) / f"session-{i}.jsonl"
+            entry = {"type": "user", "message": {"content": f"message {i}"}}
+            path.write_text(json.dumps(entry) + "\n")
+            session_files.append(path)
+        session_files.append(Path("/nonexistent/file.jsonl"))
+
+        results = extract_user_messages_many(session_files)
+        self.assertEqual(results, [[f"message {i}"] for i in range(10)] + [[]])
+
 
 class TestToolRejectionExtraction(unittest.TestCase):
     """Tests for tool rejection extraction."""
@@ -18,6 +18,7 @@ from lib.semantic_detector import (
     semantic_analyze,
     validate_queue_items,
     detect_contradictions,
+    clear_semantic_cache,
     _extract_json_from_text,
     _validate_response,
     ANALYSIS_PROMPT,
@@ -28,6 +29,9 @@ from lib.semantic_detector import (
 class TestSemanticAnalyze(unittest.TestCase):
     """Tests for semantic_analyze function."""
 
+    def setUp(self):
+        clear_semantic_cache()
+
     def _mock_claude_response(self, response_dict):
         """Create a mock subprocess result with Claude-like JSON output."""
         mock_result = MagicMock()
@@ -267,6 +271,16 @@ class TestSemanticAnalyze(unittest.TestCase):
         result = semantic_analyze("   ")
         self.assertIsNone(result)
 
+    @patch("lib.semantic_detector.subprocess.run")
+    def test_system_content_skips_claude(self, mock_run):
+        """Test that system content is judged not a learning without calling Claude."""
+        result = semantic_analyze("<system-reminder>use tabs</system-reminder>")
+        self.assertIsNotNone(result)
+        self.assertFalse(result["is_learning"])
+        self.assertIsNone(result["type"])
+        self.assertEqual(result["confidence"], 0.0)
+        mock_run.assert_not_called()
+
     @patch("lib.semantic_detector.subprocess.run")
     def test_custom_timeout(self, mock_run):
         """Test that custom timeout is passed to subprocess."""
@@ -302,6 +316,35 @@ class TestSemanticAnalyze(unittest.TestCase):
         self.assertIn("--model", call_args)
         self.assertIn("haiku", call_args)
 
+    @patch("lib.semantic_detector.subprocess.run")
+    def test_repeated_text_uses_cache(self, mock_run):
+        """Test that a repeated message reuses the earlier result."""
+        mock_run.return_value = self._mock_claude_response({
+            "is_learning": True,
+            "type": "correction",
+            "confidence": 0.85,
+            "reasoning": "Correction",
+            "extracted_learning": "Use pytest",
+        })
+
+        first = semantic_analyze("no, use pytest not unittest")
+        second = semantic_analyze("no, use pytest not unittest")
+        self.assertEqual(first, second)
+        self.assertEqual(mock_run.call_count, 1)
+
+        # A different model is a different analysis
+        semantic_analyze("no, use pytest not unittest", model="haiku")
+        self.assertEqual(mock_run.call_count, 2)
+
+    @patch("lib.semantic_detector.subprocess.run")
+    def test_failures_are_not_cached(self, mock_run):
+        """Test that a failed analysis is retried on the next call."""
+        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="error")
+
+        self.assertIsNone(semantic_analyze("no, use pytest not unittest"))
+        self.assertIsNone(semantic_analyze("no, use pytest not unittest"))
+        self.assertEqual(mock_run.call_count, 2)
+
 
 class TestExtractJsonFromText(unittest.TestCase):
     """Tests for _extract_json_from_text helper."""
@@ -463,11 +506,13 @@ class TestValidateQueueItems(unittest.TestCase):
     @patch("lib.semantic_detector.semantic_analyze")
     def test_filters_non_learnings(self, mock_analyze):
         """Test that non-learnings are filtered out."""
-        mock_analyze.side_effect = [
-            self._mock_semantic_result(True, 0.8),
-            self._mock_semantic_result(False, 0.2),
-            self._mock_semantic_result(True, 0.9),
-        ]
+        # Keyed by message: items may be analyzed concurrently
+        results = {
+            "no, use Python": self._mock_semantic_result(True, 0.8),
+            "Hello world": self._mock_semantic_result(False, 0.2),
+            "remember: use async": self._mock_semantic_result(True, 0.9),
+        }
+        mock_analyze.side_effect = lambda message, **kwargs: results[message]
 
         items = [
             {"message": "no, use Python", "confidence": 0.6},
@@ -556,11 +601,38 @@ class TestValidateQueueItems(unittest.TestCase):
         # Empty message should be skipped, only semantic_analyze called once
         self.assertEqual(mock_analyze.call_count, 1)
 
+    @patch("lib.semantic_detector.subprocess.run")
+    def test_drops_system_content(self, mock_run):
+        """Test that system-content items are dropped, not kept as a fallback."""
+        items = [{"message": "<system-reminder>use tabs</system-reminder>", "confidence": 0.6}]
+
+        result = validate_queue_items(items)
+
+        self.assertEqual(result, [])
+        mock_run.assert_not_called()
+
     def test_empty_items_list(self):
         """Test with empty items list."""
         result = validate_queue_items([])
         self.assertEqual(result, [])
 
+    @patch("lib.semantic_detector.semantic_analyze")
+    def test_many_items_keep_order(self, mock_analyze):
+        """Test that concurrently analyzed items come back in input order."""
+        mock_analyze.side_effect = lambda message, **kwargs: self._mock_semantic_result(
+            not message.endswith("skip"), 0.8
+        )
+
+        items = [{"message": f"item {i}" + (" skip" if i % 3 == 0 else ""), "confidence": 0.6}
+                 for i in range(20)]
+
+        result = validate_queue_items(items)
+
+        self.assertEqual(
+            [r["message"] for r in result],
+            [f"item {i}" for i in range(20) if i % 3 != 0],
+        )
+
 
 class TestAnalysisPrompt(unittest.TestCase):
     """Tests for the analysis prompt template."""